@@ -1,15 +1,41 @@
 import math
-import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from functools import lru_cache
 import numpy as np
-import seaborn as sns
 
 LIFETIME = 10  # years
 WACC = 0.1  # 10% discount rate
 CAPACITY_FACTOR = 0.8  # 80% capacity factor
 
+# Left-skewed basis of the Monte Carlo electricity price distribution, normalized to [0, 1]
+_X = np.linspace(0.01, 1, 100)
+_LV = np.log(_X + 1.0)  # Log function introduces skew
+_LOGSKEW_NORM = (_LV - _LV.min()) / (_LV.max() - _LV.min())
+
+
+@dataclass(frozen=True, slots=True)
+class ElectrolyzerSpec:
+    """
+    Techno-economic parameters of an electrolyzer type (see electrolyzer_options for units).
+    An array stack_cost is stored as a read-only copy, so the spec cannot be changed after creation.
+    """
+    capex_per_kw: float
+    efficiency_kwh_per_kg: float
+    lifetime_years: int
+    stack_durability: int
+    stack_cost: float | np.ndarray
+
+    def __post_init__(self):
+        if isinstance(self.stack_cost, np.ndarray):
+            stack_cost = self.stack_cost.copy()
+            stack_cost.flags.writeable = False
+            object.__setattr__(self, "stack_cost", stack_cost)
+
+
 def calculate_wacc(DF, RROE, IR, TR, inflation):
     """
     Calculate the Weighted Average Cost of Capital (WACC).
+    Every argument may also be a NumPy array; they broadcast element-wise.
 
     Parameters:
     DF (float): Debt fraction (0 to 1)
@@ -34,6 +60,7 @@ def calculate_wacc(DF, RROE, IR, TR, inflation):
     return wacc
 
 
+@lru_cache(maxsize=128)
 def calculate_crf(WACC, lifetime):
     """
     Calculate the Capital Recovery Factor (CRF).
@@ -47,10 +74,56 @@ def calculate_crf(WACC, lifetime):
     """
     if WACC == 0:  # To prevent division by zero
         return 1 / lifetime
-    crf = WACC / (1 - (1 / ((1 + WACC) ** lifetime)))
+    # 1 - (1 + WACC) ** -lifetime, evaluated without forming the large power (precise for small WACC)
+    crf = WACC / -math.expm1(-lifetime * math.log1p(WACC))
     return crf
 
 
+def calculate_crf_array(WACC, lifetime):
+    """
+    Calculate the Capital Recovery Factor (CRF) element-wise over arrays of WACC and lifetime.
+
+    Parameters:
+    WACC (array_like): Weighted Average Cost of Capital (as a decimal)
+    lifetime (array_like): Economic lifetime of the asset (years)
+
+    Returns:
+    np.ndarray: CRF as a decimal, with the broadcast shape of the inputs
+    """
+    WACC = np.asarray(WACC, dtype=np.float64)
+    lifetime = np.asarray(lifetime, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):  # zero WACC is replaced below
+        crf = WACC / -np.expm1(-lifetime * np.log1p(WACC))
+
+    return np.where(WACC == 0, 1 / lifetime, crf)
+
+
+def calculate_crf_grid(WACC, lifetime):
+    """
+    Calculate the Capital Recovery Factor (CRF) over every combination of WACC and lifetime,
+    e.g. for a sensitivity analysis.
+
+    Parameters:
+    WACC (array_like): 1-D array of WACC values (as a decimal)
+    lifetime (array_like): 1-D array of economic lifetimes (years)
+
+    Returns:
+    np.ndarray: CRF matrix of shape (len(WACC), len(lifetime))
+    """
+    return calculate_crf_array(np.asarray(WACC)[:, None], np.asarray(lifetime)[None, :])
+
+
+def _get_electrolyzer(electrolyzer):
+    """
+    Look up the ElectrolyzerSpec of an electrolyzer type, raising ValueError for unknown types.
+    """
+    try:
+        return ELECTROLYZERS[electrolyzer]
+    except KeyError:
+        raise ValueError(f"Electrolyzer type '{electrolyzer}' not found in the database.") from None
+
+
 def calculate_stack_cost(electrolyzer, cf=CAPACITY_FACTOR):
     """
     Calculate the number of stack replacements during the economic lifetime of an electrolysis unit.
@@ -58,27 +131,28 @@ def calculate_stack_cost(electrolyzer, cf=CAPACITY_FACTOR):
     Returns:
     - int: Number of stack replacements required.
     """
-    total_operating_hours = electrolyzer_options[electrolyzer]["lifetime_years"] * cf * 8760  # 8760 hours in a year
-    stack_replacements = math.floor(total_operating_hours / electrolyzer_options[electrolyzer]["stack_durability"])  # Round down
+    efficiency_data = _get_electrolyzer(electrolyzer)
+    total_operating_hours = int(efficiency_data.lifetime_years * cf * 8760)  # 8760 hours in a year
+    stack_replacements = total_operating_hours // efficiency_data.stack_durability  # Round down
 
-    return stack_replacements * electrolyzer_options[electrolyzer]["stack_cost"]
+    return stack_replacements * efficiency_data.stack_cost
 
 
-def calculate_stack_cost_arr(electrolyzer_options, system_size, cf=CAPACITY_FACTOR):
+def calculate_stack_cost_arr(efficiency_data, system_size, cf=CAPACITY_FACTOR):
     """
-    Calculate the number of stack replacements during the economic lifetime of an electrolysis unit.
+    Calculate the annualized stack replacement cost for each year of the economic lifetime of an electrolysis unit.
+    efficiency_data is an ElectrolyzerSpec (e.g. ELECTROLYZERS["SOEC"]), not an electrolyzer_options dict.
 
     Returns:
-    - int: Number of stack replacements required.
+    - np.ndarray: Stack replacement cost ($) for each year of the lifetime.
     """
-    output_arr = []
-    replacement_cycle_yrs = math.floor(electrolyzer_options["stack_durability"] / (cf * 8760))
+    output_arr = np.zeros(efficiency_data.lifetime_years)
+    replacement_cycle_yrs = math.floor(efficiency_data.stack_durability / (cf * 8760))
 
-    for yr in range(0,electrolyzer_options["lifetime_years"],replacement_cycle_yrs):
-        replacement_cost = electrolyzer_options["stack_cost"][yr] * system_size
-        # annualize cost over replacement cycle
-        annualized_cost = replacement_cost / replacement_cycle_yrs
-        output_arr += [annualized_cost] * replacement_cycle_yrs
+    for yr in range(0,efficiency_data.lifetime_years,replacement_cycle_yrs):
+        replacement_cost = efficiency_data.stack_cost[yr] * system_size
+        # annualize cost over replacement cycle (the last cycle is cut off at the end of the lifetime)
+        output_arr[yr:yr + replacement_cycle_yrs] = replacement_cost / replacement_cycle_yrs
 
     return output_arr
 
@@ -112,12 +186,9 @@ def calculate_annual_hydrogen_output(system_size_kw, electrolyzer, capacity_fact
     Returns:
     - float: Annual hydrogen production in kilograms (kg/year)
     """
-    efficiency_data = electrolyzer_options.get(electrolyzer)
-
-    if efficiency_data is None:
-        raise ValueError(f"Electrolyzer type '{electrolyzer}' not found in the database.")
+    efficiency_data = _get_electrolyzer(electrolyzer)
 
-    efficiency_kwh_per_kg = efficiency_data["efficiency_kwh_per_kg"]
+    efficiency_kwh_per_kg = efficiency_data.efficiency_kwh_per_kg
 
     # Total annual energy input (kWh)
     annual_energy_input_kwh = system_size_kw * capacity_factor * 8760
@@ -128,28 +199,63 @@ def calculate_annual_hydrogen_output(system_size_kw, electrolyzer, capacity_fact
     return annual_hydrogen_output
 
 
-def get_elec_cost_matrix(efficiency_data):
-    ELECTRICITY_COST_CURVE = np.linspace(60, 50, efficiency_data["lifetime_years"])  # $/MWh
-    # create a numpy array of electricity costs
-    cost_matrix = np.zeros((len(ELECTRICITY_COST_CURVE), 100))
+def get_elec_cost_matrix(efficiency_data, out=None):
+    """
+    Sample the electricity cost ($/kg H2) for each year of the lifetime, shape (years, 100).
+    efficiency_data is an ElectrolyzerSpec (e.g. ELECTROLYZERS["SOEC"]), not an electrolyzer_options dict.
+    """
+    ELECTRICITY_COST_CURVE = np.linspace(60, 50, efficiency_data.lifetime_years)  # $/MWh
+    if out is None:
+        out = np.empty((len(ELECTRICITY_COST_CURVE), _LOGSKEW_NORM.size))
+
+    # Scale the skewed basis around each year's mean (range [30, mean + 30]) and convert to $/kg H2, shape (years, 100)
+    mean = ELECTRICITY_COST_CURVE[:, None]
+    np.multiply(_LOGSKEW_NORM[None, :], -mean, out=out)
+    out += mean + 30
+    out *= efficiency_data.efficiency_kwh_per_kg
+    out /= 1000.0
+
+    return out
 
-    for yr in range(0,efficiency_data["lifetime_years"]):
-        mean = ELECTRICITY_COST_CURVE[yr]
-        x = np.linspace(0.01, 1, 100)
 
-        # Apply a log transformation to create left-skew
-        log_values = np.log(x + 1)  # Log function introduces skew
+def _precompute_fixed(efficiency_data, system_size_kw, kg_hydrogen, wacc=WACC, include_capital=True):
+    """
+    Calculate the capital cost per kg H2 (spread over the lifetime of the electrolyzer).
+    It does not depend on the electricity price, so it is computed once per electrolyzer and system size.
+    """
+    if not include_capital:
+        return 0.0
 
-        # Normalize and scale to center around yearly mean
-        min_val, max_val = np.min(log_values), np.max(log_values)
-        elec_prices_yr_distr = (mean + 30) - (log_values - min_val) / (max_val - min_val) * mean  # Scaling to range [30, mean + 30]
+    capital_cost = calculate_crf(wacc, efficiency_data.lifetime_years) * total_capex(efficiency_data.capex_per_kw, system_size_kw)
 
-        # Calculate the cost of electricity per kg of hydrogen
-        elec_prices_yr_distr = elec_prices_yr_distr * efficiency_data["efficiency_kwh_per_kg"] / 1000  # Convert to $/kg H2
+    return capital_cost / kg_hydrogen
 
-        cost_matrix[yr] = elec_prices_yr_distr
 
-    return cost_matrix
+def _lcoh_kernel(efficiency_data, stack_cost_arr, fixed_cost_per_kg, tax_credit, n_credited=3):
+    """
+    Numeric core of the Monte Carlo LCOH. Builds the (years, samples * (1 + n_credited)) matrix in a single
+    allocation: the electricity, yearly stack and fixed per-kg costs, followed by n_credited copies of the
+    same costs with the tax credit applied. Every step writes into the output buffer, so no intermediates are kept.
+    """
+    n_samples = _LOGSKEW_NORM.size
+    out = np.empty((efficiency_data.lifetime_years, n_samples * (1 + n_credited)))
+
+    # electricity cost, then each year's stack cost across that year's row, then the fixed costs everywhere
+    lcoh_matrix = get_elec_cost_matrix(efficiency_data, out=out[:, :n_samples])
+    lcoh_matrix += stack_cost_arr[:, None]
+    lcoh_matrix += fixed_cost_per_kg
+
+    # subtract the tax credit, set to 0 if negative
+    credited = out[:, n_samples:2 * n_samples]
+    np.subtract(lcoh_matrix, tax_credit, out=credited)
+    np.maximum(credited, 0.0, out=credited)
+
+    # weight the tax credit more heavily
+    for k in range(2, 1 + n_credited):
+        out[:, k * n_samples:(k + 1) * n_samples] = credited
+
+    return out
+
 
 def calculate_lcoh(
         electrolyzer,  # Type of electrolyzer (e.g., "PEM", "Alkaline")
@@ -163,46 +269,55 @@ def calculate_lcoh(
     Calculate the Cost of Hydrogen (LCOH) in $/kg H2.
     Includes a sensitivity analysis for the cost of electricity and stack cost
     """
-    efficiency_data = electrolyzer_options.get(electrolyzer)
+    efficiency_data = _get_electrolyzer(electrolyzer)
 
-    if efficiency_data is None:
-        raise ValueError(f"Electrolyzer type '{electrolyzer}' not found in the database.")
+    kg_hydrogen = calculate_annual_hydrogen_output(system_size_kw, electrolyzer, cf)
 
-    electrolyzer_capex_per_kw = efficiency_data["capex_per_kw"]
-    electrolyzer_lifetime_years = efficiency_data["lifetime_years"]
+    capital_cost_per_kg = _precompute_fixed(efficiency_data, system_size_kw, kg_hydrogen, wacc, include_capital)
 
-    lcoh_matrix = get_elec_cost_matrix(efficiency_data)
+    stack_cost_arr = calculate_stack_cost_arr(efficiency_data, system_size_kw, cf)
+    # divide each element by kg_hydrogen
+    stack_cost_arr = stack_cost_arr / kg_hydrogen
 
-    # Capital cost per kg H2 (spread over the lifetime of the electrolyzer)
-    if include_capital:
-        capital_cost = calculate_crf(wacc, electrolyzer_lifetime_years) * total_capex(electrolyzer_capex_per_kw, system_size_kw)
-    else:
-        capital_cost = 0
+    tax_credit = 3
 
-    kg_hydrogen = calculate_annual_hydrogen_output(system_size_kw, electrolyzer)
+    return _lcoh_kernel(efficiency_data, stack_cost_arr, capital_cost_per_kg + o_and_m_cost_per_kg, tax_credit)
 
-    capital_cost_per_kg = capital_cost / kg_hydrogen
 
-    stack_cost_arr = calculate_stack_cost_arr(efficiency_data, system_size_kw, cf)
-    # divide each element by kg_hydrogen
-    stack_cost_arr = [x / kg_hydrogen for x in stack_cost_arr]
+def _variable_part(electricity_cost_per_mwh, efficiency_kwh_per_kg):
+    """
+    Calculate the electricity cost per kg H2 ($/kg) for a scalar or an array of electricity prices ($/MWh).
+    """
+    electricity_cost_per_kwh = np.asarray(electricity_cost_per_mwh, dtype=np.float64) / 1000.0
 
-    # for each year, add the stack cost to the lcoh_matrix
-    for i in range(len(lcoh_matrix)):
-        lcoh_matrix[i] += stack_cost_arr[i]
-        lcoh_matrix[i] += o_and_m_cost_per_kg
+    return electricity_cost_per_kwh * efficiency_kwh_per_kg
 
-    # duplicate the matrix
-    lcoh_matrix_new = lcoh_matrix.copy()
-    # subtract the tax credit from the matrix, set to 0 if negative
-    tax_credit = 3
-    lcoh_matrix_new = np.where(lcoh_matrix_new - tax_credit < 0, 0, lcoh_matrix_new - tax_credit)
 
-    # weight the tax credit more heavily
-    for i in range(3):
-        lcoh_matrix = np.hstack((lcoh_matrix, lcoh_matrix_new))
+def calculate_lcoh_at_price(
+        electricity_cost_per_mwh,  # Electricity cost in $/MWh, a scalar or an array of prices to sweep
+        electrolyzer,  # Type of electrolyzer (e.g., "PEM", "Alkaline")
+        system_size_kw,  # Electrolyzer system size in kilowatts (kW)
+        o_and_m_cost_per_kg,  # Fixed O&M cost per kg of H2 ($/kg)
+        cf=CAPACITY_FACTOR,  # Electrolyzer utilization as a fraction (e.g., 0.8 for 80%)
+        wacc=WACC,  # Weighted Average Cost of Capital (WACC) as a decimal
+        include_capital=True,  # Toggle between operating vs levelized COH
+):
+    """
+    Calculate the Levelized Cost of Hydrogen (LCOH) in $/kg H2 at a fixed electricity price.
+    Accepts an array of electricity prices so a whole sweep is evaluated in one call.
+    """
+    efficiency_data = _get_electrolyzer(electrolyzer)
+
+    kg_hydrogen = calculate_annual_hydrogen_output(system_size_kw, electrolyzer, cf)
 
-    return lcoh_matrix
+    # computed once for the whole price sweep
+    capital_cost_per_kg = _precompute_fixed(efficiency_data, system_size_kw, kg_hydrogen, wacc, include_capital)
+
+    electricity_cost_per_kg = _variable_part(electricity_cost_per_mwh, efficiency_data.efficiency_kwh_per_kg)
+
+    lcoh = capital_cost_per_kg + electricity_cost_per_kg + o_and_m_cost_per_kg
+
+    return lcoh
 
 
 electrolyzer_options = {
@@ -229,28 +344,36 @@ electrolyzer_options = {
     }
 }
 
-
-LCOH = calculate_lcoh(
-    electrolyzer="SOEC",  # Proton Exchange Membrane electrolyzer
-    system_size_kw=1000,  # 1 MW electrolyzer
-    o_and_m_cost_per_kg=1.0,  # $1/kg H2 O&M cost
-)
-years = np.arange(2025, 2025 + 10)  # Years from 2025 to 2034
-
-# Create violin plot
-plt.figure(figsize=(10, 6))
-plt.boxplot(LCOH.T, positions=years, widths=0.6, patch_artist=True,
-            boxprops=dict(facecolor='lightblue', color='blue'),
-            whiskerprops=dict(color='black'),
-            capprops=dict(color='black'),
-            medianprops=dict(color='red'),
-            showfliers=False,)
-
-# Formatting
-plt.xticks(ticks=years)
-plt.xlabel("Year")
-plt.ylabel("LCOH ($/kg H₂)")
-plt.title("Monte Carlo Sim of Operating Cost of Hydrogen Over Time")
-
-# Show the plot
-plt.show()
+# ELECTROLYZERS is the source of truth for all calculations: it is built once at import time,
+# so later edits to electrolyzer_options do not reach any calculation
+ELECTROLYZERS = {name: ElectrolyzerSpec(**options) for name, options in electrolyzer_options.items()}
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    LCOH = calculate_lcoh(
+        electrolyzer="SOEC",  # Proton Exchange Membrane electrolyzer
+        system_size_kw=1000,  # 1 MW electrolyzer
+        o_and_m_cost_per_kg=1.0,  # $1/kg H2 O&M cost
+        include_capital=False,  # operating cost only
+    )
+    years = np.arange(2025, 2025 + 10)  # Years from 2025 to 2034
+
+    # Create violin plot
+    plt.figure(figsize=(10, 6))
+    plt.boxplot(LCOH.T, positions=years, widths=0.6, patch_artist=True,
+                boxprops=dict(facecolor='lightblue', color='blue'),
+                whiskerprops=dict(color='black'),
+                capprops=dict(color='black'),
+                medianprops=dict(color='red'),
+                showfliers=False,)
+
+    # Formatting
+    plt.xticks(ticks=years)
+    plt.xlabel("Year")
+    plt.ylabel("LCOH ($/kg H₂)")
+    plt.title("Monte Carlo Sim of Operating Cost of Hydrogen Over Time")
+
+    # Show the plot
+    plt.show()
@@ -1,91 +1,92 @@
-import pandas
 import pandas as pd
 import numpy as np
 
-data = pandas.read_csv("assets/mining_gas_demand.csv")
-
-# drop all columns that start with symbol
-data = data.drop(data.filter(regex='^Symbol').columns, axis=1)
-
-# create an expense dataframe with columns 1, 3, 5, 7, 9, 11
-expense = data.iloc[:, [3, 5, 7, 9, 11]]
-usage = data.iloc[:, [2, 4, 6, 8, 10]]
+# only read the quantity and expense columns of these energy types (skipping the Symbol columns);
+# the C parser strips the thousands separators in the number values while reading
+energy_types = ['Natural gas', 'Gasoline - motor', 'Diesel fuel', 'Heavy Fuel Oil', 'Electricity']
+data = pd.read_csv(
+    "assets/mining_gas_demand.csv",
+    usecols=lambda column: column.split(',')[0] in energy_types,
+    thousands=',',
+)
 
 
 def clean_columns(data):
     # rename columns by splitting the column name by comma and taking the first one
     data.columns = data.columns.str.split(',').str[0]
 
-    # take out all the commas in the string number values
-    data = data.replace({',': ''}, regex=True)
+    # make sure all the values in the dataframe are numeric; the reader normally parses them already,
+    # otherwise strip the commas from the string columns and convert them (missing values become NaN)
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in data.dtypes):
+        data = data.apply(lambda column: column if pd.api.types.is_numeric_dtype(column)
+                          else pd.to_numeric(column.str.replace(',', '', regex=False)))
 
-    # convert all the values in the dataframe to numeric except the first colujmn
-    data = data.apply(pd.to_numeric)
+    # sum up all the values in each column, skipping blank (suppressed) cells, kept apart from the data rows
+    totals = pd.Series(np.nansum(data.to_numpy(dtype=np.float64), axis=0), index=data.columns)
 
-    # add a new row that sums up all the values in each column
-    data.loc['Total', :] = data.sum(axis=0)
+    return data, totals
 
-    return data
 
+# quantity and expense columns alternate, so clean them together in one pass
+_, totals = clean_columns(data)
 
-expense = clean_columns(expense)
-usage = clean_columns(usage)
+# split the column totals into expense totals and usage (quantity) totals
+expense_totals = totals.iloc[1::2]
+usage_totals = totals.iloc[0::2]
 
 # mulitply expense by 1000
-expense = expense * 1000
+expense_totals = expense_totals * 1000
 
-usage = usage[['Gasoline - motor', 'Heavy Fuel Oil', 'Diesel fuel', 'Natural gas']]
-usage_total_mat = usage.loc['Total', :].to_numpy()
+usage_totals = usage_totals[['Gasoline - motor', 'Heavy Fuel Oil', 'Diesel fuel', 'Natural gas']]
+usage_total_mat = np.ascontiguousarray(usage_totals.to_numpy(), dtype=np.float64)
 
 # %%
 # lado energy density
 energy_density = pd.read_csv("assets/energy_density.csv")
 
 # obtain energy density numpy matrix
-energy_matrix = energy_density.iloc[:, 2:].to_numpy()
-
-# divide first 3 rows by 1000
-energy_matrix[0:3, :] = energy_matrix[0:3, :] / 1000
+energy_matrix = np.ascontiguousarray(energy_density.iloc[:, 2:].to_numpy(), dtype=np.float64)
 
-# convert Gj to kWh
-energy_matrix = energy_matrix * 277.778
+# convert Gj to kWh, dividing the first 3 rows (fuels bought by the litre) by 1000 in the same pass
+scale = np.full(energy_matrix.shape[0], 277.778)
+scale[:3] /= 1000
+energy_matrix = energy_matrix * scale[:, np.newaxis]
 
-# multiply the energy density matrix with the data dataframe
-result = energy_matrix[:, 0] * usage_total_mat
-
-# sum all the values in the result
-result = np.sum(result)
+# multiply the energy density matrix with the data dataframe and sum all the values (a single dot product)
+result = float(energy_matrix[:, 0] @ usage_total_mat)
 
 # %%
-# load in the fuel charge data
-fuel_charge = pandas.read_csv("assets/fuel_charge.csv")
-
-# create a new dataframe of just the gasoline, diesel, natural gas, and heavy fuel oil
-fuel_charge = fuel_charge.loc[[8, 9, 12, 15], :]
-
-# extract all columns except the first 2 as a numpy matrix
-fuel_charge = fuel_charge.iloc[:, 2:].to_numpy()
+# load in the fuel charge data of just the gasoline, diesel, natural gas, and heavy fuel oil rows,
+# without the first 2 (Type, Unit) columns; the parser skips the other lines entirely
+fuel_charge_rows = {8, 9, 12, 15}
+fuel_charge = pd.read_csv(
+    "assets/fuel_charge.csv",
+    skiprows=lambda line: line != 0 and line - 1 not in fuel_charge_rows,  # line 0 is the header
+    usecols=lambda column: column not in ('Type', 'Unit'),
+)
+
+# extract the fuel charges as a numpy matrix
+fuel_charge = np.ascontiguousarray(fuel_charge.to_numpy(), dtype=np.float64)
 
 # %%
-# multiply the values in the data dataframe with the fuel charge dataframe
-tax_levy = fuel_charge * usage_total_mat[:, np.newaxis]
-
-tax_levy_series = tax_levy.sum(axis=0)
+# multiply the values in the data dataframe with the fuel charge dataframe and sum over the fuels
+# (a single vector-matrix product, without the intermediate per-fuel levy matrix)
+tax_levy_series = usage_total_mat @ fuel_charge
 
 # %%
-base_cost = expense.loc['Total']
-# duplicate the base cost 8 times
-base_cost = pd.concat([base_cost] * 8, axis=1)
-
-# rename the columns to 2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030
-base_cost.columns = [2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030]
+# duplicate the base cost 8 times, one column per year 2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030
+# (copied, since rows are added to it below)
+base_cost = pd.DataFrame(
+    np.broadcast_to(expense_totals.to_numpy()[:, np.newaxis], (len(expense_totals), 8)).copy(),
+    index=expense_totals.index,
+    columns=[2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030],
+)
 
 # append the tax levy to the base cost
 base_cost.loc['Fuel Charge Tax'] = tax_levy_series
 
 # sum the fuel costs
-base_cost.loc['All Fuels'] = base_cost.loc['Natural gas'] + base_cost.loc['Gasoline - motor'] + base_cost.loc[
-    'Diesel fuel'] + base_cost.loc['Heavy Fuel Oil']
+base_cost.loc['All Fuels'] = base_cost.loc[['Natural gas', 'Gasoline - motor', 'Diesel fuel', 'Heavy Fuel Oil']].sum(axis=0)
 
 # reorder the rows to be Electricity, Tax Levy
 base_cost = base_cost.reindex(['All Fuels', 'Fuel Charge Tax'])
@@ -104,72 +105,78 @@ kgs_hydrogen = usage_total_kwh / 33.33
 # cost of hydrogen
 cost_hydrogen = kgs_hydrogen * 1.5
 
-# create a hydrogen cost dataframe
-cost_hydrogen_df = pd.concat([pd.Series(cost_hydrogen)] * 8, axis=1)
-cost_hydrogen_df.columns = [2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030]
-
-# set the index of cost_hydrogen_df Hydrogen, Electricity
-cost_hydrogen_df.index = ['Hydrogen']
+# create a hydrogen cost dataframe, duplicating the cost for each year 2023 to 2030
+cost_hydrogen_df = pd.DataFrame(
+    np.broadcast_to(cost_hydrogen[:, np.newaxis], (len(cost_hydrogen), 8)).copy(),
+    index=['Hydrogen'],
+    columns=[2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030],
+)
 
 # convert to million cad
 cost_hydrogen_df = cost_hydrogen_df / 1000000
 
 # %%
-import matplotlib.pyplot as plt
-import numpy as np
+def plot(base_cost, cost_hydrogen_df):
+    import matplotlib.pyplot as plt
+
+    # Define colors
+    colors = {
+        'All Fuels': '#BCAB79',
+        'Hydrogen': '#2978A0',
+        'Fuel Charge Tax': '#315659'
+    }
+    # Define bar width
+    bar_width = 0.4
+
+    # Get the number of categories (columns)
+    categories = base_cost.columns
+    x = np.arange(len(categories))  # X positions for bars
+
+    # Initialize figure and axis
+    fig, ax = plt.subplots()
+
+    # Plot base_cost as stacked bars
+    # bottom of each layer is the running total of the layers below it
+    vals_base = base_cost.to_numpy()
+    bottoms_base = np.vstack([np.zeros(len(categories)), vals_base.cumsum(axis=0)[:-1]])
+    for i, label in enumerate(base_cost.index):
+        ax.bar(
+            x - bar_width / 2,
+            vals_base[i],
+            width=bar_width,
+            label=f'{label}',
+            bottom=bottoms_base[i],
+            color=colors.get(label, 'gray')  # Use the color from the dictionary, default to gray if missing
+        )
+
+    # Plot cost_hydrogen_df as stacked bars, shifted to the right
+    vals_hydrogen = cost_hydrogen_df.to_numpy()
+    bottoms_hydrogen = np.vstack([np.zeros(len(categories)), vals_hydrogen.cumsum(axis=0)[:-1]])
+    for i, label in enumerate(cost_hydrogen_df.index):
+        ax.bar(
+            x + bar_width / 2,
+            vals_hydrogen[i],
+            width=bar_width,
+            label=f'{label}',
+            bottom=bottoms_hydrogen[i],
+            color=colors.get(label, 'gray')  # Use the color from the dictionary, default to gray if missing
+        )
+
+    # Labels and title
+    ax.set_xticks(x)
+    ax.set_xticklabels(categories)
+    plt.title("Fuel Cost Comparison")
+    plt.ylabel("Cost (in million CAD)")
+    plt.xlabel("Year")
+    plt.legend()
+
+    plt.show()
 
-# Define colors
-colors = {
-    'All Fuels': '#BCAB79',
-    'Hydrogen': '#2978A0',
-    'Fuel Charge Tax': '#315659'
-}
-# Define bar width
-bar_width = 0.4
-
-# Get the number of categories (columns)
-categories = base_cost.columns
-x = np.arange(len(categories))  # X positions for bars
-
-# Initialize figure and axis
-fig, ax = plt.subplots()
-
-# Plot base_cost as stacked bars
-bottom_base = np.zeros(len(categories))  # Initialize bottom position
-for label in base_cost.index:
-    ax.bar(
-        x - bar_width / 2,
-        base_cost.loc[label],
-        width=bar_width,
-        label=f'{label}',
-        bottom=bottom_base,
-        color=colors.get(label, 'gray')  # Use the color from the dictionary, default to gray if missing
-    )
-    bottom_base += base_cost.loc[label].values  # Stack bars
-
-# Plot cost_hydrogen_df as stacked bars, shifted to the right
-bottom_hydrogen = np.zeros(len(categories))  # Initialize bottom position
-for label in cost_hydrogen_df.index:
-    ax.bar(
-        x + bar_width / 2,
-        cost_hydrogen_df.loc[label],
-        width=bar_width,
-        label=f'{label}',
-        bottom=bottom_hydrogen,
-        color=colors.get(label, 'gray')  # Use the color from the dictionary, default to gray if missing
-    )
-    bottom_hydrogen += cost_hydrogen_df.loc[label].values  # Stack bars
-
-# Labels and title
-ax.set_xticks(x)
-ax.set_xticklabels(categories)
-plt.title("Fuel Cost Comparison")
-plt.ylabel("Cost (in million CAD)")
-plt.xlabel("Year")
-plt.legend()
-
-plt.show()
 
 #%%
 # calculate cumulative savings of using hydrogen
-cumulative_savings = base_cost.loc['All Fuels'] + base_cost.loc['Fuel Charge Tax'] - cost_hydrogen_df.loc['Hydrogen']
\ No newline at end of file
+cumulative_savings = base_cost.loc['All Fuels'] + base_cost.loc['Fuel Charge Tax'] - cost_hydrogen_df.loc['Hydrogen']
+
+
+if __name__ == "__main__":
+    plot(base_cost, cost_hydrogen_df)
@@ -1,11 +1,8 @@
-from lcoh_calculator import calculate_lcoh, calculate_annual_hydrogen_output
-from bokeh.plotting import figure, show
-from bokeh.models import ColumnDataSource, FactorRange, Whisker
-from bokeh.palettes import Category10
+from lcoh_calculator import calculate_lcoh_at_price, calculate_annual_hydrogen_output
 import pandas as pd
 import numpy as np
 
-LCOH = calculate_lcoh(
+LCOH = calculate_lcoh_at_price(
     electricity_cost_per_mwh=50,  # $80/MWh
     electrolyzer="PEM",  # Proton Exchange Membrane electrolyzer
     system_size_kw=1000,  # 1 MW electrolyzer
@@ -60,71 +57,78 @@ bf_bof_breakdown = {
 categories = list(dri_eaf_breakdown.keys())[:-2]
 steel_types = ["Green Steel", "Regular Steel"]
 
-# Create a DataFrame for stacking
-data = {
-    "categories": categories,
-    "Green Steel": list(dri_eaf_breakdown.values())[:-2],
-    "Regular Steel": list(bf_bof_breakdown.values())[:-2],
-}
-df = pd.DataFrame(data)
-
-df.set_index("categories", inplace=True)
-df = df.T
-df.reset_index(inplace=True)
-
-# Color palette
-colors = Category10[4][:len(categories)]  # Adjust palette as needed
-
-# Create figure
-p = figure(
-    x_range=FactorRange(*steel_types),
-    height=400,
-    width=600,
-    title="Green Steel vs. Regular Steel Cost Breakdown",
-    toolbar_location=None,
-    y_axis_label="Cost per Ton ($)",
-)
+# cost components as a (steel type, category) array, and the energy cost bounds per steel type
+breakdowns = [dri_eaf_breakdown, bf_bof_breakdown]
+costs = np.array([[breakdown[category] for category in categories] for breakdown in breakdowns])
+energy_bounds = np.array([[breakdown['upper'], breakdown['lower']] for breakdown in breakdowns])
+
+# Create a DataFrame for stacking, one row per steel type and one column per category
+df = pd.DataFrame({"index": steel_types, **dict(zip(categories, costs.T))})
+
+# cost excluding energy (the last category), which the whiskers are drawn on top of
+base_totals = costs[:, :-1].sum(axis=1)
 
-error_source = ColumnDataSource({
+error_data = {
     'steel_type': steel_types,
-    'upper': [
-        sum(v for k,v in dri_eaf_breakdown.items() if k not in ('upper', 'lower', "Energy")) + dri_eaf_breakdown['upper'],
-        sum(v for k,v in bf_bof_breakdown.items() if k not in ('upper', 'lower', "Energy")) + bf_bof_breakdown['upper']],
-    'lower': [
-        sum(v for k,v in dri_eaf_breakdown.items() if k not in ('upper', 'lower', "Energy")) + dri_eaf_breakdown['lower'],
-        sum(v for k,v in bf_bof_breakdown.items() if k not in ('upper', 'lower', "Energy")) + bf_bof_breakdown['lower']],
-})
-
-# Add error whiskers
-whisker = Whisker(
-    base='steel_type',
-    upper='upper',
-    lower='lower',
-    level='annotation',
-    source=error_source,
-    line_width=2,
-    line_color='black'
-)
-p.add_layout(whisker)
-
-# Plot stacked bars
-p.vbar_stack(
-    stackers=categories,
-    x='index',
-    width=0.5,
-    color=colors,
-    source=df,
-    legend_label=categories,
-)
+    'upper': base_totals + energy_bounds[:, 0],
+    'lower': base_totals + energy_bounds[:, 1],
+}
+
 
-# Customize plot
-p.y_range.start = 0
-p.x_range.range_padding = 0.1
-p.xgrid.grid_line_color = None
-p.axis.minor_tick_line_color = None
-p.outline_line_color = None
-p.legend.title = "Cost Components"
-p.legend.location = "top_right"
-
-# Show plot
-show(p)
\ No newline at end of file
+def render(df, categories, steel_types, error_data):
+    from bokeh.plotting import figure, show
+    from bokeh.models import ColumnDataSource, FactorRange, Whisker
+    from bokeh.palettes import Category10
+
+    # Color palette
+    colors = Category10[4][:len(categories)]  # Adjust palette as needed
+
+    # Create figure
+    p = figure(
+        x_range=FactorRange(*steel_types),
+        height=400,
+        width=600,
+        title="Green Steel vs. Regular Steel Cost Breakdown",
+        toolbar_location=None,
+        y_axis_label="Cost per Ton ($)",
+    )
+
+    error_source = ColumnDataSource(error_data)
+
+    # Add error whiskers
+    whisker = Whisker(
+        base='steel_type',
+        upper='upper',
+        lower='lower',
+        level='annotation',
+        source=error_source,
+        line_width=2,
+        line_color='black'
+    )
+    p.add_layout(whisker)
+
+    # Plot stacked bars
+    p.vbar_stack(
+        stackers=categories,
+        x='index',
+        width=0.5,
+        color=colors,
+        source=df,
+        legend_label=categories,
+    )
+
+    # Customize plot
+    p.y_range.start = 0
+    p.x_range.range_padding = 0.1
+    p.xgrid.grid_line_color = None
+    p.axis.minor_tick_line_color = None
+    p.outline_line_color = None
+    p.legend.title = "Cost Components"
+    p.legend.location = "top_right"
+
+    # Show plot
+    show(p)
+
+
+if __name__ == "__main__":
+    render(df, categories, steel_types, error_data)